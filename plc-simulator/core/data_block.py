@@ -1,40 +1,154 @@
 from typing import Dict, List
-from .tag import Tag
+import numpy as np
+from asyncua import ua
+from .tag import Tag, AccessType
+from ._kernels import step
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Мертвая зона: изменения меньше этой доли значения не публикуются
+_DEADBAND = 1e-4
+
 class DataBlock:
     """Имитация Data Block (DB) контроллера Siemens"""
-    
+
     def __init__(self, db_number: int, name: str, tags_config: List[dict]):
         self.db_number = db_number
         self.name = name
         self.tags: Dict[str, Tag] = {}
-        
+
         # Создаем теги
         for tag_config in tags_config:
             tag = Tag(tag_config)
             self.tags[tag.name] = tag
-            
+
+        # Хеш-индекс адресов: поиск тега за O(1) вместо перебора
+        self._by_address: Dict[str, Tag] = {}
+        for tag in self.tags.values():
+            self._by_address[tag.address] = tag
+            self._by_address[tag.short_address] = tag
+
+        # Разделяем теги на этапе загрузки: динамические (числовые,
+        # RO, с дрейфом) идут в SoA-массивы и обсчитываются каждый
+        # такт, статические в такте не обходятся вовсе
+        self._dynamic_tags: List[Tag] = []
+        self._static_tags: List[Tag] = []
+        for tag in self.tags.values():
+            if (tag.drift_enabled
+                    and tag.access is AccessType.READ_ONLY
+                    and tag._is_numeric):
+                self._dynamic_tags.append(tag)
+            else:
+                self._static_tags.append(tag)
+
+        # Параллельные массивы для векторизованной симуляции
+        self._vals = np.array(
+            [float(t._value) for t in self._dynamic_tags], dtype=np.float64
+        )
+        self._mins = np.array(
+            [t.min_value if t.min_value is not None else -np.inf
+             for t in self._dynamic_tags],
+            dtype=np.float64
+        )
+        self._maxs = np.array(
+            [t.max_value if t.max_value is not None else np.inf
+             for t in self._dynamic_tags],
+            dtype=np.float64
+        )
+        self._drift_rates = np.array(
+            [t.drift_rate for t in self._dynamic_tags], dtype=np.float64
+        )
+        self._noisy_out = np.empty_like(self._vals)
+
+        # Теги, опубликованные на OPC UA сервере (заполняется
+        # build_live_tags после инициализации сервера)
+        self._live_dynamic: List[tuple] = []
+        self._live_static: List[Tag] = []
+
         logger.info(f"Created DB{db_number}.{name} with {len(self.tags)} tags")
     
     def get_tag_by_address(self, address: str) -> Tag:
-        """Получить тег по адресу (например 'DB1.Speed')"""
-        expected = f"DB{self.db_number}.{address}"
-        for tag in self.tags.values():
-            if tag.address == expected:
-                return tag
-        return None
+        """Получить тег по адресу (например 'Speed' или 'DB1.Speed')"""
+        return self._by_address.get(address)
     
     def get_all_tags(self) -> List[Tag]:
         """Получить все теги DB"""
         return list(self.tags.values())
     
     def update_simulation(self, dt: float):
-        """Обновить все теги в DB"""
-        for tag in self.tags.values():
-            tag.update_simulation(dt)
+        """Обновить динамические теги DB (дрейф и шум считаются JIT-ядром)
+
+        Статические теги меняются только извне (запись RW-тега), их
+        кэш обновляет сеттер — ходить по ним каждый такт не нужно.
+        """
+        if len(self._dynamic_tags) == 0:
+            return
+
+        # Дрейф, ограничение и шумовой снимок одним проходом
+        step(self._vals, self._mins, self._maxs,
+             self._drift_rates, dt, self._noisy_out)
+
+        # Возвращаем значения в теги; _cast подкласса приводит к типу
+        # хранения (int-теги храним целыми)
+        for i, tag in enumerate(self._dynamic_tags):
+            cast = tag._cast
+            tag._value = cast(self._vals[i])
+            tag._noisy_value = cast(self._noisy_out[i])
+
+    def build_live_tags(self):
+        """Отобрать теги, опубликованные на OPC UA сервере
+
+        Вызывается один раз после init_opcua_server: атрибуты opcua_*
+        уже установлены безусловно, поэтому в такте не нужны проверки
+        hasattr по каждому тегу.
+        """
+        self._live_dynamic = [
+            (i, tag) for i, tag in enumerate(self._dynamic_tags)
+            if tag.opcua_node is not None
+        ]
+        self._live_static = [
+            tag for tag in self._static_tags
+            if tag.opcua_node is not None
+        ]
+
+    def tick(self, dt: float) -> list:
+        """Такт симуляции: обновить теги и собрать пары (nodeid, DataValue)
+
+        Чистый compute без await — выполняется в пуле потоков
+        симулятора, не блокируя цикл событий.
+        """
+        self.update_simulation(dt)
+
+        # Такт не ловит исключения сам: любая ошибка (конвертера,
+        # конструктора ua-типов) всплывает в update_loop, где ее
+        # логирует со стектрейсом внешний try
+        pairs = []
+        noisy = self._noisy_out
+        for i, tag in self._live_dynamic:
+            value = tag._converter(noisy[i])
+
+            # Публикуем только изменения за пределами мертвой зоны
+            last = tag._last_pushed_value
+            if last is not None and abs(value - last) <= _DEADBAND * (abs(value) + 1):
+                continue
+
+            # ua.Variant/ua.DataValue — frozen-датаклассы, менять их
+            # по месту нельзя: на каждое изменение строим свежую пару
+            tag._last_pushed_value = value
+            pairs.append((tag.opcua_nodeid, ua.DataValue(
+                ua.Variant(value, tag.opcua_variant_type)
+            )))
+        for tag in self._live_static:
+            value = tag._converter(tag.value)
+            if value == tag._last_pushed_value:
+                continue
+
+            tag._last_pushed_value = value
+            pairs.append((tag.opcua_nodeid, ua.DataValue(
+                ua.Variant(value, tag.opcua_variant_type)
+            )))
+        return pairs
     
     def to_dict(self):
         """Для диагностики"""
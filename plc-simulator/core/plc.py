@@ -1,12 +1,31 @@
 from typing import Dict, List
 from asyncua import Server, ua
 import asyncio
+import concurrent.futures
 import logging
 from .data_block import DataBlock
-from .tag import Tag
+from .tag import Tag, DataType
 
 logger = logging.getLogger(__name__)
 
+# Типы Variant по типу данных тега (ключ — член enum, не строка)
+_VARIANT_TYPES = {
+    DataType.BOOL: ua.VariantType.Boolean,
+    DataType.INT: ua.VariantType.Int32,  # Явно Int32, не Int64
+    DataType.FLOAT: ua.VariantType.Float,  # Float, не Double
+    DataType.BYTE: ua.VariantType.Byte,
+    DataType.STRING: ua.VariantType.String,
+}
+
+# Конвертеры значений по типу Variant (привязываются к тегу один раз)
+_CONVERTERS = {
+    ua.VariantType.Int32: int,
+    ua.VariantType.Float: float,
+    ua.VariantType.Boolean: bool,
+    ua.VariantType.Byte: lambda v: int(v) & 0xFF,
+    ua.VariantType.String: str,
+}
+
 class PLCSimulator:
     """Главный класс симулятора контроллера"""
     
@@ -16,6 +35,16 @@ class PLCSimulator:
         self.name = config['plc']['name']
         self.endpoint = config['plc']['endpoint']
         self.update_rate = config['plc']['update_rate']
+
+        # Буферизация записей: копим изменения и сбрасываем их одним
+        # батчем раз в flush_interval или при наборе max_batch штук
+        self.flush_interval = config['plc'].get('flush_interval', self.update_rate)
+        self.max_batch = config['plc'].get('max_batch', 512)
+        self._pending = {}
+
+        # Пул потоков для шага симуляции: NumPy/numba отпускают GIL,
+        # поэтому цикл событий продолжает обслуживать клиентов
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
         
         # OPC UA сервер
         self.server = Server()
@@ -28,6 +57,7 @@ class PLCSimulator:
         self.running = False
         self.update_task = None
         self.server_running = False
+        self._loop = None
         
         # Словарь для хранения OPC UA узлов
         self.opcua_nodes = {}
@@ -50,33 +80,7 @@ class PLCSimulator:
     
     def _get_variant_type(self, tag: Tag) -> ua.VariantType:
         """Получить правильный тип Variant для тега"""
-        type_mapping = {
-            "bool": ua.VariantType.Boolean,
-            "int": ua.VariantType.Int32,  # Явно Int32, не Int64
-            "float": ua.VariantType.Float,  # Float, не Double
-            "byte": ua.VariantType.Byte,
-            "string": ua.VariantType.String
-        }
-        return type_mapping.get(tag.data_type.value, ua.VariantType.Float)
-    
-    def _convert_to_correct_type(self, value, variant_type: ua.VariantType):
-        """Конвертировать значение в правильный тип"""
-        try:
-            if variant_type == ua.VariantType.Int32:
-                return int(value)
-            elif variant_type == ua.VariantType.Float:
-                return float(value)
-            elif variant_type == ua.VariantType.Boolean:
-                return bool(value)
-            elif variant_type == ua.VariantType.Byte:
-                return int(value) & 0xFF
-            elif variant_type == ua.VariantType.String:
-                return str(value)
-            else:
-                return value
-        except Exception as e:
-            logger.error(f"Type conversion error: {e}")
-            return value
+        return _VARIANT_TYPES.get(tag.data_type, ua.VariantType.Float)
     
     async def init_opcua_server(self):
         """Инициализация OPC UA сервера"""
@@ -114,7 +118,10 @@ class PLCSimulator:
                     node = await self._add_tag_to_server(db_node, tag)
                     # Сохраняем ссылку на узел
                     self.opcua_nodes[tag.address] = node
-            
+
+                # Фиксируем список живых тегов для такта
+                db.build_live_tags()
+
             self.server_running = True
             logger.info(f"OPC UA server initialized at {self.endpoint}")
             logger.info(f"Namespace index: {self.namespace_idx}")
@@ -129,9 +136,13 @@ class PLCSimulator:
         try:
             # Получаем правильный тип для OPC UA
             variant_type = self._get_variant_type(tag)
-            
+
+            # Привязываем конвертер один раз — в такте не остается
+            # ни if-цепочки, ни поиска по словарю
+            tag._converter = _CONVERTERS.get(variant_type, lambda v: v)
+
             # Конвертируем начальное значение в правильный тип
-            initial_value = self._convert_to_correct_type(tag._value, variant_type)
+            initial_value = tag._converter(tag._value)
             
             # Создаем Variant с правильным типом
             variant = ua.Variant(initial_value, variant_type)
@@ -165,7 +176,11 @@ class PLCSimulator:
             # Сохраняем тип для последующего использования при обновлениях
             tag.opcua_variant_type = variant_type
             tag.opcua_node = var
-            
+
+            # Прямой доступ к адресному пространству для быстрых записей
+            tag.opcua_nodeid = var.nodeid
+
+
             logger.debug(f"Added tag {tag.address} with type {variant_type}")
             return var
             
@@ -173,54 +188,79 @@ class PLCSimulator:
             logger.error(f"Failed to add tag {tag.address}: {e}")
             raise
     
+    async def _flush_updates(self, pairs):
+        """Записать пачку значений напрямую в адресное пространство
+
+        Сервер локальный, поэтому обходим сервисный слой OPC UA
+        (кодирование WriteRequest и проверки сессии) и пишем
+        сразу в AddressSpace.
+        """
+        aspace = self.server.iserver.aspace
+        for nodeid, data_value in pairs:
+            # DataValue построен тактом заново и больше не меняется,
+            # поэтому его можно отдавать по ссылке без копии
+            status = await aspace.write_attribute_value(
+                nodeid, ua.AttributeIds.Value, data_value
+            )
+            if status.is_bad():
+                logger.warning(f"Write failed for {nodeid}: {status}")
+
+    def _compute_step(self, dt: float) -> list:
+        """Шаг симуляции всех DB; чистый compute для пула потоков"""
+        pairs = []
+        for db in self.data_blocks.values():
+            pairs.extend(db.tick(dt))
+        return pairs
+
     async def update_loop(self):
         """Цикл обновления значений"""
-        last_time = asyncio.get_event_loop().time()
-        
+        self._loop = asyncio.get_running_loop()
+        loop = self._loop
+
+        last_time = loop.time()
+        last_flush = last_time
+        next_deadline = last_time
+
         while self.running:
             try:
-                current_time = asyncio.get_event_loop().time()
+                current_time = loop.time()
                 dt = current_time - last_time
-                
-                # Обновляем все теги
-                update_count = 0
-                for db in self.data_blocks.values():
-                    db.update_simulation(dt)
-                    
-                    # Обновляем значения в OPC UA сервере
-                    for tag in db.get_all_tags():
-                        if hasattr(tag, 'opcua_node') and tag.opcua_node:
-                            try:
-                                # Конвертируем значение в правильный тип
-                                if hasattr(tag, 'opcua_variant_type'):
-                                    corrected_value = self._convert_to_correct_type(
-                                        tag.value, 
-                                        tag.opcua_variant_type
-                                    )
-                                    
-                                    # Создаем Variant с правильным типом
-                                    variant = ua.Variant(
-                                        corrected_value, 
-                                        tag.opcua_variant_type
-                                    )
-                                    
-                                    # Записываем значение
-                                    await tag.opcua_node.write_value(variant)
-                                    update_count += 1
-                            except Exception as e:
-                                logger.debug(f"Error updating {tag.address}: {e}")
-                
-                # Считаем статистику
-                self.read_count += update_count
+
+                # Шаг симуляции считаем в пуле потоков, чтобы не
+                # блокировать цикл событий на больших конфигурациях
+                pairs = await loop.run_in_executor(
+                    self._pool, self._compute_step, dt
+                )
+
+                # Накапливаем изменения; повторное обновление тега до
+                # сброса просто перезаписывает значение по nodeid
+                self._pending.update(pairs)
+
+                # Сбрасываем батч по таймеру или при переполнении
+                if self._pending and (
+                        len(self._pending) >= self.max_batch
+                        or current_time - last_flush >= self.flush_interval):
+                    await self._flush_updates(self._pending.items())
+                    self.read_count += len(self._pending)
+                    self._pending.clear()
+                    last_flush = current_time
                 
                 last_time = current_time
-                await asyncio.sleep(self.update_rate)
+
+                # Спим до дедлайна, а не фиксированный интервал: такт
+                # не дрейфует, даже если батч-запись заняла время.
+                # После долгого простоя (например паузы на ошибке)
+                # пропускаем недогнанные такты вместо их наверстывания
+                next_deadline = max(next_deadline + self.update_rate, loop.time())
+                await asyncio.sleep(max(0.0, next_deadline - loop.time()))
                 
             except asyncio.CancelledError:
                 logger.info("Update loop cancelled")
                 break
-            except Exception as e:
-                logger.error(f"Error in update loop: {e}")
+            except Exception:
+                # Со стектрейсом: одна строка вида "Error in update
+                # loop: ..." раз в секунду маскирует полный отказ такта
+                logger.exception("Error in update loop")
                 await asyncio.sleep(1)
     
     async def start(self):
@@ -275,6 +315,8 @@ class PLCSimulator:
             except asyncio.CancelledError:
                 pass
         
+        self._pool.shutdown(wait=False)
+
         if self.server_running:
             try:
                 self.server.stop()  # Убрал await, так как это может быть синхронный метод
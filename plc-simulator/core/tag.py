@@ -1,4 +1,4 @@
-import random
+import sys
 import time
 import logging
 from enum import Enum
@@ -17,100 +17,73 @@ class DataType(Enum):
     STRING = "string"
 
 class Tag:
-    """Модель тега (переменной) контроллера"""
-    
+    """Модель тега (переменной) контроллера
+
+    Tag(config) — фабрика: по config['type'] возвращается подкласс
+    с мономорфными реализациями горячих методов, без ветвлений
+    по data_type на каждом вызове.
+    """
+
+    # Переопределяется в числовых подклассах
+    _is_numeric = False
+
+    def __new__(cls, config):
+        if cls is Tag:
+            cls = _TAG_CLASSES[DataType(config['type'])]
+        return super().__new__(cls)
+
     def __init__(self, config):
         self.name = config['name']
-        self.address = config['address']
+        # Интернируем адреса: сравнение и хеш в словарях сводятся
+        # к сравнению указателей
+        self.address = sys.intern(config['address'])
+        # Короткий адрес без префикса DB (например 'Speed' из 'DB1.Speed')
+        self.short_address = sys.intern(self.address.split('.', 1)[-1])
         self.data_type = DataType(config['type'])
         self.access = AccessType(config.get('access', 'RO'))
         self.unit = config.get('unit', '')
         self.min_value = config.get('min')
         self.max_value = config.get('max')
-        
+
         # Инициализация значения
         self._value = self._convert_initial(config['initial'])
         self._original_value = self._value
+        self._noisy_value = self._value
+
         self.quality = "GOOD"  # GOOD, BAD, UNCERTAIN
         self.timestamp = time.time()
-        
+
         # Для симуляции
-        self.noise_enabled = True
         self.drift_enabled = True
         self.drift_rate = 0.001
-        
+
         # OPC UA аттрибуты
         self.opcua_node = None
         self.opcua_variant_type = None
-        
+        self.opcua_nodeid = None
+        self._converter = None
+        self._last_pushed_value = None
+
         logger.debug(f"Created tag {self.address}: {self._value}")
-    
+
     def _convert_initial(self, value):
         """Конвертировать начальное значение в нужный тип"""
-        if self.data_type == DataType.BOOL:
-            return bool(value)
-        elif self.data_type == DataType.INT:
-            return int(value)
-        elif self.data_type == DataType.FLOAT:
-            return float(value)
-        elif self.data_type == DataType.BYTE:
-            return int(value) & 0xFF
-        else:
-            return str(value)
-    
+        return value
+
     @property
     def value(self):
-        """Текущее значение с учетом шума"""
-        if not self.noise_enabled:
-            return self._value
-        
-        # Добавляем шум (2% от значения)
-        if self.data_type in [DataType.INT, DataType.FLOAT]:
-            noise = random.gauss(0, abs(self._value) * 0.02)
-            noisy_value = self._value + noise
-            
-            # Ограничиваем
-            if self.min_value is not None:
-                noisy_value = max(self.min_value, noisy_value)
-            if self.max_value is not None:
-                noisy_value = min(self.max_value, noisy_value)
-            
-            if self.data_type == DataType.INT:
-                return int(noisy_value)
-            return float(noisy_value)
-        
-        return self._value
-    
+        """Текущее значение с учетом шума (кэш, обновляется раз в такт)"""
+        return self._noisy_value
+
     @value.setter
     def value(self, new_value):
         """Установка значения (только для RW тегов)"""
-        if self.access == AccessType.READ_WRITE:
+        if self.access is AccessType.READ_WRITE:
             self._value = self._convert_initial(new_value)
+            self._noisy_value = self._value
             self.timestamp = time.time()
             logger.debug(f"Tag {self.address} set to {self._value}")
-    
-    def update_simulation(self, dt):
-        """Обновление симуляции (дрейф и т.д.)"""
-        if not self.drift_enabled or self.access == AccessType.READ_WRITE:
-            return
-        
-        # Медленный дрейф значения
-        if self.data_type in [DataType.INT, DataType.FLOAT]:
-            drift = random.uniform(-self.drift_rate, self.drift_rate) * dt
-            new_value = self._value + drift
-            
-            # Ограничиваем
-            if self.min_value is not None:
-                new_value = max(self.min_value, new_value)
-            if self.max_value is not None:
-                new_value = min(self.max_value, new_value)
-            
-            # Сохраняем в правильном типе
-            if self.data_type == DataType.INT:
-                self._value = int(new_value)
-            else:
-                self._value = float(new_value)
-    
+
     def to_dict(self):
         """Для отправки в Kafka"""
         return {
@@ -119,4 +92,66 @@ class Tag:
             'quality': self.quality,
             'timestamp': self.timestamp,
             'unit': self.unit
-        }
\ No newline at end of file
+        }
+
+
+class _NumericTag(Tag):
+    """Общий код числовых тегов
+
+    Дрейф и шум считаются не здесь, а JIT-ядром в _kernels.step:
+    DataBlock держит значения динамических тегов в SoA-массивах и
+    записывает результаты такта обратно в теги.
+    """
+
+    _is_numeric = True
+
+    # Приведение к типу хранения, задается подклассом
+    _cast = staticmethod(float)
+
+
+class IntTag(_NumericTag):
+    """Целочисленный тег"""
+
+    _cast = staticmethod(int)
+
+    def _convert_initial(self, value):
+        return int(value)
+
+
+class FloatTag(_NumericTag):
+    """Вещественный тег"""
+
+    _cast = staticmethod(float)
+
+    def _convert_initial(self, value):
+        return float(value)
+
+
+class BoolTag(Tag):
+    """Логический тег"""
+
+    def _convert_initial(self, value):
+        return bool(value)
+
+
+class ByteTag(Tag):
+    """Байтовый тег"""
+
+    def _convert_initial(self, value):
+        return int(value) & 0xFF
+
+
+class StringTag(Tag):
+    """Строковый тег"""
+
+    def _convert_initial(self, value):
+        return str(value)
+
+
+_TAG_CLASSES = {
+    DataType.BOOL: BoolTag,
+    DataType.INT: IntTag,
+    DataType.FLOAT: FloatTag,
+    DataType.BYTE: ByteTag,
+    DataType.STRING: StringTag,
+}
@@ -43,52 +43,68 @@ async def test_read():
             # Получаем все Data Blocks
             db_nodes = await plc_node.get_children()
             logger.info(f"Found {len(db_nodes)} Data Blocks")
-            
-            # Читаем все теги
+
+            # Один обход: кэшируем узлы тегов по ключу (DB, имя) —
+            # одноименные теги в разных DB не затирают друг друга,
+            # дальше повторный browse не нужен
+            nodes_by_key = {}
+            units_by_key = {}
+            db_layout = []
             for db_node in db_nodes:
                 db_name = await db_node.read_browse_name()
-                logger.info(f"\nReading from {db_name}:")
-                
                 tags = await db_node.get_children()
+
+                tag_names = []
                 for tag in tags:
+                    tag_name = await tag.read_browse_name()
+
+                    # Пробуем прочитать описание/единицы измерения
                     try:
-                        tag_name = await tag.read_browse_name()
-                        value = await tag.read_value()
-                        
-                        # Пробуем прочитать описание/единицы измерения
-                        try:
-                            description = await tag.read_description()
-                            unit = description.Text if description else ""
-                        except:
-                            unit = ""
-                        
-                        logger.info(f"  {tag_name} = {value} {unit}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error reading tag: {e}")
-            
+                        description = await tag.read_description()
+                        unit = description.Text if description else ""
+                    except Exception:
+                        unit = ""
+
+                    key = (db_name.Name, tag_name.Name)
+                    nodes_by_key[key] = tag
+                    units_by_key[key] = unit
+                    tag_names.append(tag_name)
+                db_layout.append((db_name, tag_names))
+
+            # Читаем все теги одним ReadRequest
+            values = await client.read_values(list(nodes_by_key.values()))
+            values_by_key = dict(zip(nodes_by_key.keys(), values))
+
+            for db_name, tag_names in db_layout:
+                logger.info(f"\nReading from {db_name}:")
+                for tag_name in tag_names:
+                    key = (db_name.Name, tag_name.Name)
+                    logger.info(
+                        f"  {tag_name} = {values_by_key[key]} {units_by_key[key]}"
+                    )
+
             # Пробуем записать в RW тег (например, Speed)
             logger.info("\nTesting write operation...")
             try:
-                # Находим тег Speed
-                for db_node in db_nodes:
-                    tags = await db_node.get_children()
-                    for tag in tags:
-                        tag_name = await tag.read_browse_name()
-                        if tag_name.Name == "Speed":
-                            # Читаем текущее значение
-                            current = await tag.read_value()
-                            logger.info(f"Current Speed: {current}")
-                            
-                            # Пробуем записать новое значение
-                            new_value = current + 100
-                            await tag.write_value(new_value)
-                            logger.info(f"Wrote new value: {new_value}")
-                            
-                            # Проверяем что записалось
-                            verified = await tag.read_value()
-                            logger.info(f"Verified value: {verified}")
-                            break
+                # Тег Speed берем из кэша, без повторного обхода DB
+                speed_node = next(
+                    (node for (_, name), node in nodes_by_key.items()
+                     if name == "Speed"),
+                    None
+                )
+                if speed_node:
+                    # Читаем текущее значение
+                    current = await speed_node.read_value()
+                    logger.info(f"Current Speed: {current}")
+
+                    # Пробуем записать новое значение
+                    new_value = current + 100
+                    await speed_node.write_value(new_value)
+                    logger.info(f"Wrote new value: {new_value}")
+
+                    # Проверяем что записалось
+                    verified = await speed_node.read_value()
+                    logger.info(f"Verified value: {verified}")
             except Exception as e:
                 logger.error(f"Write test failed: {e}")
             